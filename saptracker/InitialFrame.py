@@ -6,16 +6,18 @@ Version: 1.3.0
 """
 import cv2
 import numpy as np
+from framesource import (FrameSource, openSource, closeSource, grayFrame, scalePoints,
+                         scaleLength)
 
 
-def darknessIntensity(path: str, percent: float):
+def darknessIntensity(path: str | FrameSource, percent: float):
     """ Compute the frame-by-frame darkness of the video until
     the required percentage is reached.
 
     Parameters
     ----------
-    path : str
-        Path to the video to be analyzed.
+    path : str or FrameSource
+        Path to the video to be analyzed or frame source to read it.
     percent : float
         Minimum required percentage of darkness in the video.
 
@@ -23,30 +25,39 @@ def darknessIntensity(path: str, percent: float):
     -------
     fps, orientation : int, int
         Return the frame where the video reachs the darkness `fps` and the
-        orientation of the video `orientation`.
+        orientation of the video `orientation`. `fps` is None if the video ends
+        without reaching the darkness.
     """    
-    captureLI = cv2.VideoCapture(path)
+    captureLI = openSource(path)
     orientationLI = captureLI.get(cv2.CAP_PROP_ORIENTATION_META)
+    fpsLI = None
     while(captureLI.isOpened()):
         _ret, frameLI = captureLI.read()
         fpsLI = int(captureLI.get(cv2.CAP_PROP_POS_FRAMES))
             
         if _ret == True:
   
-         gray = cv2.cvtColor(frameLI, cv2.COLOR_BGR2GRAY)
+         gray = grayFrame(frameLI)
          histogram = cv2.calcHist([gray],[0], None, [256], [0,256])
          # Sums the range [0,35] that represents darkness
          darkness = sum(histogram[0:35])
         
-         if darkness > (1920*1080)*percent:
+         if darkness > (gray.shape[0]*gray.shape[1])*percent:
             print('From the frame number %i' %fpsLI + ' the video has %'+
                   str(int(percent*100)) + ' of darkness.')
-            captureLI.release()
+            closeSource(captureLI, path)
             cv2.destroyAllWindows()
             break
             
          else:
             continue
+
+        else:
+            # End of the video without the required darkness
+            print('The video ended without %' + str(int(percent*100)) + ' of darkness.')
+            fpsLI = None
+            closeSource(captureLI, path)
+            break
         
     return fpsLI, orientationLI
     
@@ -66,14 +77,14 @@ def auxiliarImage(frameAI: cv2.typing.MatLike, area_pointsAI: np.ndarray):
     auxiliar_image : any
         Modified frame with the same dimensions as the original.
     """    
-    grayAI = cv2.cvtColor(frameAI, cv2.COLOR_BGR2GRAY)
+    grayAI = grayFrame(frameAI)
     aux_imageAI = np.zeros(shape=(frameAI.shape[:2]), dtype=np.uint8)
     aux_imageAI = cv2.drawContours(aux_imageAI, [area_pointsAI], -1, (255), -1)
     image_areaAI = cv2.bitwise_and(grayAI, grayAI, mask= aux_imageAI)
         
     return image_areaAI
     
-def morphologicTransform(imageMT: cv2.typing.MatLike):
+def morphologicTransform(imageMT: cv2.typing.MatLike, scaleMT: float = 1.0):
     """Transform the frame to enhance the visibility of the particle using 
     morphological transformations.
 
@@ -81,6 +92,8 @@ def morphologicTransform(imageMT: cv2.typing.MatLike):
     ----------
     imageMT : any
         Frame to be transformed.
+    scaleMT : float, optional
+        Scale factor of the frame with respect to the original video, by default 1.0.
 
     Returns
     -------
@@ -89,7 +102,8 @@ def morphologicTransform(imageMT: cv2.typing.MatLike):
         same dimensions as the original.
     """    
     #Kernel to generate elliptic/circles shapes
-    kernelMT = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5,5))
+    sizeMT = scaleLength(5, scaleMT)
+    kernelMT = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (sizeMT,sizeMT))
     img_maskMT = cv2.morphologyEx(imageMT, cv2.MORPH_CLOSE, kernelMT)
     img_dilMT = cv2.dilate(img_maskMT, None, iterations= 1)
     demosMT = cv2.demosaicing(img_dilMT, code= cv2.COLOR_BayerBG2GRAY)
@@ -117,31 +131,37 @@ def minimumArea(frameMA: cv2.typing.MatLike):
 
     return _min_area
     
-def movementDetector(path: str, fps: int, area_points: np.ndarray):
+def movementDetector(path: str | FrameSource, fps: int, area_points: np.ndarray,
+                     show: bool = True):
     """Find the frame number where the particle begins to move. This function uses the
     superposition of five frames to detect a change in the area occupied by the particle, 
     based on a threshold of 2 times the area of the single particle.
 
     Parameters
     ----------
-    path : str
-        Path to the video to be analyzed.
+    path : str or FrameSource
+        Path to the video to be analyzed or frame source to read it.
     fps : int
         Frame number where the video has the required darkness.
     area_points : NDarray
         Area of interest to search for particle movement, avoiding noise from other areas.
+    show : bool, optional
+        If True, shows the superposed frames where the motion was detected and waits
+        for a key. Default is True.
 
     Returns
     -------
     initial_frame : int
-        Frame number where the particle begins to move in the video.
+        Frame number where the particle begins to move in the video, None if the video
+        ends without detecting motion.
     """    
     frames = []
     frames_count = []
     min_area = 0
 
-    capture = cv2.VideoCapture(path)
-    capture.set(cv2.CAP_PROP_POS_FRAMES, fps)
+    capture = openSource(path)
+    capture.seek(fps)
+    area_points = scalePoints(area_points, capture.scale)
         
     while(capture.isOpened()):
         ret , frame = capture.read()
@@ -149,7 +169,7 @@ def movementDetector(path: str, fps: int, area_points: np.ndarray):
             
         if ret == True:
             aux_img = auxiliarImage(frame, area_points)
-            img_mask = morphologicTransform(aux_img)
+            img_mask = morphologicTransform(aux_img, capture.scale)
             # cv2.imshow('mask', img_mask); cv2.waitKey(0)
             
             if min_area == 0:
@@ -175,15 +195,19 @@ def movementDetector(path: str, fps: int, area_points: np.ndarray):
                     continue
             
                 else:
-                    cv2.imshow('Sum', sum_frames); cv2.waitKey(0)
+                    if show == True:
+                        cv2.imshow('Sum', sum_frames); cv2.waitKey(0)
                     print('Motion detected from frame number: ')
                     print(frames_count[0])
                     break
             
         else: 
-            continue
+            # End of the video without detecting motion
+            print('The video ended without detecting motion.')
+            closeSource(capture, path)
+            return None
     
-    capture.release()   
+    closeSource(capture, path)   
     init_frame = frames_count[0]
     return init_frame
 
@@ -7,8 +7,10 @@ Version: 2.3.0
 
 import numpy as np
 import cv2
+from framesource import (FrameSource, openSource, closeSource, grayFrame, scalePoints,
+                         scaleLength)
 
-def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
+def getBoundingBox(first_fps: int, path: str | FrameSource, area_points: np.ndarray,
                   orientation: int = 0, show: bool =False):
  """Gets the bounding box that encloses the particle in the initial frame.
  If the function fails to find the bounding box, it increments the frame number by 1
@@ -18,8 +20,8 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
  ----------
  first_fps : int
     Frame number where the particle begins to move.
- path : str
-    Path to the video to analyzed.
+ path : str or FrameSource
+    Path to the video to analyzed or frame source to read it.
  area_points : np.ndarray
     Area of interest to search the particle in the frame, 
     avoiding noise from other areas.
@@ -37,12 +39,17 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
     not found on the initial frame given.
  """    
  _attempts = 0
- delta = 4
+ _capture = openSource(path)
+ # Sizes in pixels of the original video
+ delta = scaleLength(4, _capture.scale)
+ min_radius = scaleLength(5, _capture.scale)
+ max_radius = scaleLength(30, _capture.scale)
+ area_points = scalePoints(area_points, _capture.scale)
  while True:
     _attempts += 1    
     try:
-        _capture = cv2.VideoCapture(path)
-        _capture.set(cv2.CAP_PROP_POS_FRAMES, first_fps)
+        # Consecutive attempts read the next frame without seeking again
+        _capture.seek(first_fps)
         success, _frame = _capture.read()
 
         if orientation == 90:
@@ -55,7 +62,7 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
             area_points = np.array(inverse)
         
         # Create an area to find the particle, minimizing the noise
-        gray = cv2.cvtColor(_frame, cv2.COLOR_BGR2GRAY)
+        gray = grayFrame(_frame)
         aux_image = np.zeros(shape=(_frame.shape[:2]), dtype=np.uint8)
         aux_image = cv2.drawContours(aux_image, [area_points], -1, (255), -1)
         image_area = cv2.bitwise_and(gray, gray, mask= aux_image)
@@ -63,7 +70,7 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
         bn = cv2.inRange(image_area, np.array([15]), np.array([255]))
 
         estimate = cv2.HoughCircles(gray,cv2.HOUGH_GRADIENT_ALT, 1, 2000, param1=50, 
-                                    param2=0.85, minRadius=5, maxRadius=30)
+                                    param2=0.85, minRadius=min_radius, maxRadius=max_radius)
         estims = np.round(estimate[0,:]).astype('int')
         estim = np.round(estims[0,:]).astype('int')
         (a,b,r) = estim
@@ -77,6 +84,7 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
             print("The limit of attempts has been exceeded.")
             print("Particle not found. Last analyzed frame: ",
                   first_fps)
+            closeSource(_capture, path)
             
             return None
     
@@ -92,7 +100,7 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
         bbox_delta = [bbox[0] - delta, bbox[1] - delta,
                       bbox[2] + delta, bbox[3] + delta]
         
-        _capture.release()
+        closeSource(_capture, path)
     
         if show == True:
             p1 = bbox_delta[0], bbox_delta[1]
@@ -102,7 +110,7 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
     
         return bbox_delta, first_fps
 
-def selectBoundingBox(first_fps: int, path: str):
+def selectBoundingBox(first_fps: int, path: str | FrameSource):
     """Displays the initial frame to the user and allows them to manually select
     the bounding box by right-clicking and dragging the mouse.
 
@@ -110,17 +118,19 @@ def selectBoundingBox(first_fps: int, path: str):
     ----------
     first_fps : int
         Frame number of the initial frame.
-    path : str
-        Path to the video to be analyzed.
+    path : str or FrameSource
+        Path to the video to be analyzed or frame source to read it.
 
     Returns
     -------
     bbox : Rect
         The bounding box with the upper-left corner (x, y), width, and height.
     """    
-    capture = cv2.VideoCapture(path)
-    capture.set(cv2.CAP_PROP_POS_FRAMES, first_fps)
+    capture = openSource(path)
+    capture.seek(first_fps)
     success, frame = capture.read()
+    if frame.ndim == 2:
+        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
     
     window = "BBOX"
     font = cv2.FONT_HERSHEY_SIMPLEX
@@ -129,7 +139,7 @@ def selectBoundingBox(first_fps: int, path: str):
     cv2.putText(frame, 'Press ENTER to confirm.', (200, 70), font, 1, (0,255,0), 2)
     cv2.moveWindow(window, 179, 139)
     bbox = cv2.selectROI(window, frame, True)
-    capture.release()
+    closeSource(capture, path)
     cv2.destroyAllWindows()
     
     return bbox
@@ -0,0 +1,250 @@
+"""
+Created on Monday October 19 2026 10:30 GMT-6
+Autor: Alberto Estudillo Moreno
+Version: 1.0.0
+
+Frame source shared by the InitialFrame, autobbox and tracker modules.
+"""
+import os
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+# Reduced modes of imread, the image is decoded directly at the lower resolution
+REDUCED_COLOR = {0.5: cv2.IMREAD_REDUCED_COLOR_2, 0.25: cv2.IMREAD_REDUCED_COLOR_4,
+                 0.125: cv2.IMREAD_REDUCED_COLOR_8}
+REDUCED_GRAY = {0.5: cv2.IMREAD_REDUCED_GRAYSCALE_2, 0.25: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+                0.125: cv2.IMREAD_REDUCED_GRAYSCALE_8}
+
+
+class FrameSource:
+    """Reads the frames of a video, a directory of extracted frames or a list of
+    frames already in memory, with the same interface for the three cases.
+
+    `read` returns the next frame (fast sequential read) and `seek` moves to an
+    exact frame number (accurate seek). Short forward seeks are resolved by grabbing
+    the frames in between, instead of asking the backend to decode again from the
+    previous keyframe.
+
+    Parameters
+    ----------
+    source : str or list
+        Path to the video, path to a directory with the frames as images (sorted by
+        name) or a list/array of frames.
+    backend : int, optional
+        Capture backend of OpenCV (cv2.CAP_FFMPEG, cv2.CAP_GSTREAMER, ...), by default
+        cv2.CAP_ANY.
+    threads : int, optional
+        Number of decoder threads, by default None (backend default). Ignored if the
+        OpenCV version does not support cv2.CAP_PROP_N_THREADS.
+    gray : bool, optional
+        If True, returns the frames in gray scale, by default False.
+    scale : float, optional
+        Scale factor applied to the frames, by default 1.0. The area of interest and
+        the sizes in pixels used by the modules are scaled with the same factor, and the
+        trajectory computed by the tracker is given in pixels of the original video.
+        The bounding boxes are given in pixels of the scaled frame.
+    seek_window : int, optional
+        Maximum number of frames to grab sequentially in a forward seek before using
+        the seek of the backend, by default 30.
+    """
+    def __init__(self, source, backend: int = cv2.CAP_ANY, threads: int = None,
+                 gray: bool = False, scale: float = 1.0, seek_window: int = 30):
+        self.source = source
+        self.backend = backend
+        self.threads = threads
+        self.gray = gray
+        self.scale = scale
+        self.seek_window = seek_window
+        self._capture = None
+        self._frames = None
+        self._position = 0
+
+        if isinstance(source, str) and os.path.isdir(source):
+            self._frames = sorted(os.path.join(source, name) for name in os.listdir(source)
+                                  if name.lower().endswith(IMAGE_EXTENSIONS))
+        elif not isinstance(source, str):
+            self._frames = list(source)
+
+    def _open(self):
+        """Opens the video capture with the selected backend and decoder threads."""
+        params = []
+        if self.threads is not None and hasattr(cv2, 'CAP_PROP_N_THREADS'):
+            params += [cv2.CAP_PROP_N_THREADS, self.threads]
+
+        self._capture = cv2.VideoCapture(self.source, self.backend, params)
+        self._position = 0
+
+    def _convert(self, frame: cv2.typing.MatLike, reduced: bool = False):
+        """Applies the gray scale and the scale factor to a decoded frame."""
+        if self.gray == True and frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        if self.scale != 1.0 and reduced == False:
+            frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale,
+                               interpolation=cv2.INTER_AREA)
+        return frame
+
+    def _readImage(self, item):
+        """Reads a frame from the directory or from memory."""
+        if not isinstance(item, str):
+            return self._convert(np.array(item, copy=True))
+
+        if self.gray == True:
+            flag = REDUCED_GRAY.get(self.scale, cv2.IMREAD_GRAYSCALE)
+        else:
+            flag = REDUCED_COLOR.get(self.scale, cv2.IMREAD_COLOR)
+
+        image = cv2.imread(item, flag)
+        if image is None:
+            return None
+
+        return self._convert(image, reduced=self.scale in REDUCED_COLOR)
+
+    def isOpened(self):
+        """Returns True if the source has frames available to read."""
+        if self._frames is not None:
+            return True
+
+        if self._capture is None:
+            self._open()
+
+        return self._capture.isOpened()
+
+    def read(self):
+        """Reads the next frame of the source.
+
+        Returns
+        -------
+        ret, frame : bool, any
+            True and the frame if it was read, False and None otherwise.
+        """
+        if self._frames is not None:
+            if self._position >= len(self._frames):
+                return False, None
+
+            frame = self._readImage(self._frames[self._position])
+            if frame is None:
+                return False, None
+
+            self._position += 1
+            return True, frame
+
+        if self._capture is None:
+            self._open()
+
+        ret, frame = self._capture.read()
+        if ret == False:
+            return False, None
+
+        self._position += 1
+        return True, self._convert(frame)
+
+    def seek(self, index: int):
+        """Moves the source to the frame number `index`, so the next call of `read`
+        returns that frame.
+
+        Parameters
+        ----------
+        index : int
+            Frame number.
+
+        Returns
+        -------
+        success : bool
+            True if the source is at the required frame.
+        """
+        if self._frames is not None:
+            self._position = min(max(int(index), 0), len(self._frames))
+            return self._position == index
+
+        if self._capture is None:
+            self._open()
+
+        offset = index - self._position
+        if 0 <= offset <= self.seek_window:
+            for _ in range(offset):
+                if not self._capture.grab():
+                    return False
+                self._position += 1
+
+            return True
+
+        self._capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+        self._position = int(self._capture.get(cv2.CAP_PROP_POS_FRAMES))
+
+        return self._position == index
+
+    def get(self, prop: int):
+        """Returns a property of the source in the same way as cv2.VideoCapture.get.
+        The frame number (cv2.CAP_PROP_POS_FRAMES) is the one of the next frame to read.
+        """
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return self._position
+
+        if self._frames is not None:
+            if prop == cv2.CAP_PROP_FRAME_COUNT:
+                return len(self._frames)
+            return 0
+
+        if self._capture is None:
+            self._open()
+
+        return self._capture.get(prop)
+
+    def release(self):
+        """Releases the video capture. The source is opened again if it is read later."""
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+        self._position = 0
+
+
+def openSource(path):
+    """Returns the frame source to read the frames of `path`.
+
+    Parameters
+    ----------
+    path : str, list or FrameSource
+        Path to the video or to a directory of frames, a list of frames or a frame
+        source already configured.
+
+    Returns
+    -------
+    source : FrameSource
+        If `path` is already a FrameSource, it is returned without changes.
+    """
+    if isinstance(path, FrameSource):
+        return path
+
+    return FrameSource(path)
+
+def closeSource(source: FrameSource, path):
+    """Releases `source` only if it was opened by openSource from `path`. A frame
+    source given by the caller stays open at its current frame for the next function.
+    """
+    if source is not path:
+        source.release()
+
+def scalePoints(points: np.ndarray, scale: float):
+    """Scales points given in pixels of the original video to the scaled frame."""
+    if scale == 1.0:
+        return points
+
+    return np.round(np.asarray(points) * scale).astype(np.int32)
+
+def scaleLength(length: int, scale: float):
+    """Scales a length given in pixels of the original video to the scaled frame."""
+    if scale == 1.0:
+        return length
+
+    return max(1, int(round(length * scale)))
+
+def grayFrame(frame: cv2.typing.MatLike):
+    """Returns the frame in gray scale, the frame is not converted if it is already gray."""
+    if frame.ndim == 2:
+        return frame
+
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
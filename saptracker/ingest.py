@@ -0,0 +1,385 @@
+"""
+Created on Monday October 19 2026 16:40 GMT-6
+Autor: Alberto Estudillo Moreno
+Version: 1.0.0
+
+Watches a directory and obtains the trajectory of every new video with the
+InitialFrame -> autobbox -> tracker pipeline.
+"""
+import os
+import json
+import time
+import signal
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import cv2
+
+from framesource import FrameSource
+from InitialFrame import darknessIntensity, movementDetector
+from autobbox import getBoundingBox
+from tracker import trackingParticleCSRT
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv')
+# Times a video is started before it is marked as failed when a worker process dies
+MAX_ATTEMPTS = 2
+
+
+class VideoNotReady(RuntimeError):
+    """The video could not be opened or has no frames, e.g. it is still being copied."""
+
+
+def ignoreInterrupt():
+    """Makes the worker processes ignore Ctrl+C, so only the service handles it and
+    the videos in progress can finish."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def processVideo(path: str, output_dir: str, area_points: np.ndarray, percent: float = 0.97,
+                 threads: int = None, name: str = None):
+    """Obtains the trajectory of the particle in a video and saves it as a .dat file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the video to be analyzed.
+    output_dir : str
+        Directory where the trajectory is saved.
+    area_points : np.ndarray
+        Area of interest to search the particle, for a horizontal video.
+    percent : float, optional
+        Minimum required percentage of darkness in the video, by default 0.97.
+    threads : int, optional
+        Number of decoder threads, by default None (backend default).
+    name : str, optional
+        Name of the trajectory file without extension, by default the name of the video.
+
+    Returns
+    -------
+    trajectory_path : str
+        Path to the saved trajectory.
+
+    Raises
+    ------
+    VideoNotReady
+        If the video could not be opened or has no frames.
+    """
+    source = FrameSource(path, threads=threads)
+    try:
+        if not source.isOpened() or source.get(cv2.CAP_PROP_FRAME_COUNT) <= 0:
+            raise VideoNotReady('Could not open ' + path)
+
+        fps, orientation = darknessIntensity(source, percent)
+        if fps is None:
+            raise RuntimeError('Required darkness not reached.')
+        orientation = int(orientation)
+
+        # movementDetector expects the area already rotated, getBoundingBox rotates it
+        motion_points = area_points
+        if orientation == 90:
+            motion_points = np.array([point[::-1] for point in area_points])
+
+        initial_frame = movementDetector(source, fps, motion_points, show=False)
+        if initial_frame is None:
+            raise RuntimeError('No motion detected from frame number ' + str(fps))
+
+        result = getBoundingBox(initial_frame, source, area_points, orientation)
+        if result is None:
+            raise RuntimeError('Particle not found from frame number ' + str(initial_frame))
+
+        bbox, initial_frame = result
+        trajectory = trackingParticleCSRT(source, initial_frame, bbox, 0, orientation)
+
+    finally:
+        source.release()
+
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    trajectory_path = os.path.join(output_dir, name + '.dat')
+    np.savetxt(trajectory_path, np.array(trajectory))
+
+    return trajectory_path
+
+
+class IngestService:
+    """Watches `input_dir` and processes the new videos with at most `workers`
+    videos at the same time. A video is queued once its size and modification time
+    have not changed for `settle` seconds, so files still being copied are skipped.
+
+    The state of every video (in-progress, done or failed) is saved in `state_file`,
+    so after a restart the videos already seen are not processed again. A video is
+    identified by its name, size and modification time, so a new recording that reuses
+    the name of a previous one is processed too. Videos that were in progress when the
+    service stopped are marked as failed; removing their entry from the state file
+    queues them again. A video that cannot be opened yet is watched again as a new
+    file, and a video whose worker process died is started again up to MAX_ATTEMPTS
+    times.
+
+    Parameters
+    ----------
+    input_dir : str
+        Directory watched for new videos.
+    output_dir : str
+        Directory where the trajectories are saved.
+    area_points : np.ndarray
+        Area of interest to search the particle, for a horizontal video.
+    percent : float, optional
+        Minimum required percentage of darkness in the videos, by default 0.97.
+    workers : int, optional
+        Maximum number of videos processed at the same time, by default 2.
+    threads : int, optional
+        Number of decoder threads of each video, by default None (backend default).
+    interval : float, optional
+        Seconds between two scans of the directory, by default 5.
+    settle : float, optional
+        Seconds a video must remain unchanged to be considered complete, by default 10.
+    state_file : str, optional
+        Path to the state file, by default 'ingest_state.json' in `output_dir`.
+    """
+    def __init__(self, input_dir: str, output_dir: str, area_points: np.ndarray,
+                 percent: float = 0.97, workers: int = 2, threads: int = None,
+                 interval: float = 5.0, settle: float = 10.0, state_file: str = None):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.area_points = area_points
+        self.percent = percent
+        self.workers = workers
+        self.threads = threads
+        self.interval = interval
+        self.settle = settle
+        self.state_file = state_file or os.path.join(output_dir, 'ingest_state.json')
+
+        # Keys of the state, 'name:size:mtime'
+        self.queue = deque()
+        self.running = {}
+        # name -> (size, mtime, time when that size and mtime were first seen)
+        self._candidates = {}
+        self.state = self._loadState()
+        # Queued videos were not started, so they are queued again
+        for key, record in self.state.items():
+            if record['status'] == 'queued':
+                self.queue.append(key)
+
+    def _loadState(self):
+        """Loads the state file, marking the interrupted videos as failed."""
+        if not os.path.exists(self.state_file):
+            return {}
+
+        with open(self.state_file) as file:
+            state = json.load(file)
+
+        for key, record in state.items():
+            if record['status'] == 'in-progress':
+                record['status'] = 'failed'
+                record['error'] = 'Interrupted before finishing.'
+
+        return state
+
+    def _saveState(self):
+        """Saves the state file, replacing the previous one only when it is complete."""
+        temporary = self.state_file + '.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(self.state, file, indent=1)
+        os.replace(temporary, self.state_file)
+
+    def _trajectoryName(self, name: str, mtime: int):
+        """Returns the name of the trajectory file, adding the modification time if a
+        previous video with the same name was already seen."""
+        stem = os.path.splitext(name)[0]
+        for record in self.state.values():
+            if record['file'] == name:
+                print(name + ' was already seen with another size or date, saving its '
+                      'trajectory as ' + stem + '_' + str(mtime) + '.dat')
+                return stem + '_' + str(mtime)
+
+        return stem
+
+    def scan(self):
+        """Queues the complete videos of `input_dir` that have not been seen before."""
+        now = time.time()
+        for name in sorted(os.listdir(self.input_dir)):
+            if not name.lower().endswith(VIDEO_EXTENSIONS):
+                continue
+
+            # The file may be renamed or deleted after listing the directory
+            try:
+                stat = os.stat(os.path.join(self.input_dir, name))
+            except OSError:
+                self._candidates.pop(name, None)
+                continue
+
+            size_mtime = (stat.st_size, int(stat.st_mtime))
+            key = '%s:%i:%i' % ((name,) + size_mtime)
+            if key in self.state:
+                continue
+
+            previous = self._candidates.get(name)
+            if previous is None or previous[:2] != size_mtime:
+                self._candidates[name] = size_mtime + (now,)
+                continue
+
+            if now - previous[2] >= self.settle:
+                del self._candidates[name]
+                self.queue.append(key)
+                self.state[key] = {'status': 'queued', 'file': name, 'ready': now,
+                                   'name': self._trajectoryName(name, size_mtime[1])}
+
+    def _submit(self, executor: ProcessPoolExecutor):
+        """Starts queued videos until `workers` videos are in progress."""
+        while self.queue and len(self.running) < self.workers:
+            key = self.queue[0]
+            record = self.state[key]
+            # Raises BrokenProcessPool if a worker died, the video stays in the queue
+            self.running[key] = executor.submit(processVideo,
+                                                os.path.join(self.input_dir, record['file']),
+                                                self.output_dir, self.area_points,
+                                                self.percent, self.threads, record['name'])
+            self.queue.popleft()
+            record['status'] = 'in-progress'
+            record['started'] = time.time()
+            record['attempts'] = record.get('attempts', 0) + 1
+            print('Processing ' + record['file'])
+
+    def _collect(self):
+        """Records the result of the finished videos."""
+        for key, future in list(self.running.items()):
+            if not future.done():
+                continue
+
+            del self.running[key]
+            record = self.state[key]
+
+            try:
+                trajectory = future.result()
+            except VideoNotReady:
+                # Watched again as a new file, it is queued when it can be opened
+                del self.state[key]
+                print('Could not open ' + record['file'] + ', waiting for it again.')
+            except BrokenProcessPool:
+                self._retryOrFail(key, 'Worker process stopped unexpectedly.')
+            except BaseException as error:
+                self._fail(key, repr(error))
+            else:
+                record['status'] = 'done'
+                record['trajectory'] = trajectory
+                record['finished'] = time.time()
+                record['latency'] = record['finished'] - record['ready']
+                print('Done ' + record['file'] + ' in %.1f s' % record['latency'])
+
+    def _fail(self, key: str, error: str):
+        """Marks a video as failed."""
+        record = self.state[key]
+        record['status'] = 'failed'
+        record['error'] = error
+        record['finished'] = time.time()
+        print('Failed ' + record['file'] + ': ' + error)
+
+    def _retryOrFail(self, key: str, error: str):
+        """Queues again a video stopped by a dead worker process, or marks it as failed
+        once it was started MAX_ATTEMPTS times."""
+        record = self.state[key]
+        if record.get('attempts', 0) >= MAX_ATTEMPTS:
+            self._fail(key, error)
+            return
+
+        record['status'] = 'queued'
+        self.queue.appendleft(key)
+        print('Queued again ' + record['file'] + ': ' + error)
+
+    def _failRunning(self, error: str):
+        """Marks the videos in progress as failed."""
+        for key in list(self.running):
+            self._fail(key, error)
+        self.running.clear()
+
+    def _newExecutor(self):
+        """Creates the pool of worker processes."""
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=ignoreInterrupt)
+
+    def status(self):
+        """Returns the queue depth, the videos in progress and the processing latency.
+
+        Returns
+        -------
+        status : dict
+            `queued`, `in_progress`, `done` and `failed` counts, and the `last_latency`
+            and `mean_latency` in seconds, from the video being complete in the directory
+            to its trajectory being saved (None if no video has finished yet). All the
+            values include the videos of previous runs saved in the state file.
+        """
+        statuses = [record['status'] for record in self.state.values()]
+        done = sorted((record for record in self.state.values() if record['status'] == 'done'),
+                      key=lambda record: record['finished'])
+        latencies = [record['latency'] for record in done]
+        return {'queued': len(self.queue),
+                'in_progress': len(self.running),
+                'done': len(done),
+                'failed': statuses.count('failed'),
+                'last_latency': latencies[-1] if latencies else None,
+                'mean_latency': float(np.mean(latencies)) if latencies else None}
+
+    def step(self, executor: ProcessPoolExecutor):
+        """Runs one scan of the directory, collects the finished videos and starts the
+        queued ones, saving the state file."""
+        try:
+            self._collect()
+            self.scan()
+            self._submit(executor)
+        finally:
+            self._saveState()
+
+    def run(self):
+        """Watches the directory until the process is interrupted."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._saveState()
+
+        executor = self._newExecutor()
+        try:
+            while True:
+                try:
+                    self.step(executor)
+                except BrokenProcessPool:
+                    # A worker died (e.g. a crash of the decoder), the pool is replaced
+                    print('A worker process stopped unexpectedly, restarting the workers.')
+                    self._collect()
+                    for key in list(self.running):
+                        self._retryOrFail(key, 'Worker process stopped unexpectedly.')
+                    self.running.clear()
+                    executor.shutdown(wait=False)
+                    executor = self._newExecutor()
+
+                except OSError as error:
+                    # e.g. the shared directory is not mounted, retried in the next scan
+                    print('Error accessing the directories: ' + repr(error))
+
+                print(self.status())
+                time.sleep(self.interval)
+
+        except KeyboardInterrupt:
+            print('Stopping, waiting for the videos in progress.')
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._collect()
+            self._failRunning('Interrupted before finishing.')
+            self._saveState()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Obtains the trajectory of every new '
+                                                 'video in a directory.')
+    parser.add_argument('input_dir', help='Directory watched for new videos.')
+    parser.add_argument('output_dir', help='Directory where the trajectories are saved.')
+    parser.add_argument('--area', nargs='+', default=['1201,697', '1201,381', '767,381', '767,697'],
+                        help='Points x,y of the area of interest for a horizontal video.')
+    parser.add_argument('--percent', type=float, default=0.97)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--interval', type=float, default=5.0)
+    parser.add_argument('--settle', type=float, default=10.0)
+    args = parser.parse_args()
+
+    area_points = np.array([[int(value) for value in point.split(',')] for point in args.area])
+    service = IngestService(args.input_dir, args.output_dir, area_points, args.percent,
+                            args.workers, args.threads, args.interval, args.settle)
+    service.run()
@@ -9,6 +9,8 @@ Using autobbox module
 import numpy as np
 import pandas as pd
 import cv2
+from framesource import (FrameSource, openSource, closeSource, grayFrame, scalePoints,
+                         scaleLength)
 import time
 import matplotlib.pyplot as plt
 
@@ -31,6 +33,8 @@ def liveTracking(fps: int, frame: cv2.typing.MatLike, points: np.ndarray, boundi
     windowN = "Tracking"
     font = cv2.FONT_HERSHEY_SIMPLEX
     pts=np.array(points, dtype=np.int32)
+    if frame.ndim == 2:
+        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
     p1 = (int(boundingbox[0]), int(boundingbox[1]))
     p2 = (int(boundingbox[0]+boundingbox[2]), int(boundingbox[1]+boundingbox[3]))
     
@@ -47,26 +51,27 @@ def liveTracking(fps: int, frame: cv2.typing.MatLike, points: np.ndarray, boundi
     cv2.imshow(windowN, frame)    
     cv2.waitKey(1)
     
-def getRotation(video_path: str):
+def getRotation(video_path: str | FrameSource):
     """Gets the rotation of the video.
 
     Parameters
     ----------
-    video_path : str
-        Path to the video to be analyzed.
+    video_path : str or FrameSource
+        Path to the video to be analyzed or frame source to read it.
 
     Returns
     -------
     orientation : int
         
     """    
-    video = cv2.VideoCapture(video_path)
+    video = openSource(video_path)
     orientation = video.get(cv2.CAP_PROP_ORIENTATION_META)
     orientation = int(orientation)
+    closeSource(video, video_path)
 
     return orientation
 
-def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
+def getBoundingBox(first_fps: int, path: str | FrameSource, area_points: np.ndarray,
                   orientation: int = 0, show: bool = False):
  """Gets the bounding box that encloses the particle in the initial frame.
  If the function fails to find the bounding box, it increments the frame number by 1
@@ -76,8 +81,8 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
  ----------
  first_fps : int
     Frame number where the particle begins to move.
- path : str
-    Path to the video to analyzed.
+ path : str or FrameSource
+    Path to the video to analyzed or frame source to read it.
  area_points : np.ndarray
     Area of interest to search the particle in the frame, 
     avoiding noise from other areas.
@@ -95,12 +100,17 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
     not found on the initial frame given.
  """    
  _attempts = 0
- delta = 4
+ _capture = openSource(path)
+ # Sizes in pixels of the original video
+ delta = scaleLength(4, _capture.scale)
+ min_radius = scaleLength(5, _capture.scale)
+ max_radius = scaleLength(30, _capture.scale)
+ area_points = scalePoints(area_points, _capture.scale)
  while True:
     _attempts += 1    
     try:
-        _capture = cv2.VideoCapture(path)
-        _capture.set(cv2.CAP_PROP_POS_FRAMES, first_fps)
+        # Consecutive attempts read the next frame without seeking again
+        _capture.seek(first_fps)
         success, _frame = _capture.read()
         if orientation == 90:
             inverse = []
@@ -112,7 +122,7 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
             area_points = np.array(inverse)
         
         # Create an area to find the particle, minimizing the noise
-        gray = cv2.cvtColor(_frame, cv2.COLOR_BGR2GRAY)
+        gray = grayFrame(_frame)
         aux_image = np.zeros(shape=(_frame.shape[:2]), dtype=np.uint8)
         aux_image = cv2.drawContours(aux_image, [area_points], -1, (255), -1)
         image_area = cv2.bitwise_and(gray, gray, mask= aux_image)
@@ -121,7 +131,7 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
         bn[bn>=1] = 255
 
         estimate = cv2.HoughCircles(gray,cv2.HOUGH_GRADIENT_ALT, 1, 2000, param1=50, 
-                                    param2=0.85, minRadius=5, maxRadius=30)
+                                    param2=0.85, minRadius=min_radius, maxRadius=max_radius)
         estims = np.round(estimate[0,:]).astype('int')
         estim = np.round(estims[0,:]).astype('int')
         (a,b,r) = estim
@@ -135,6 +145,7 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
             print("The limit of attempts has been exceeded.")
             print("Particle not found. Last analyzed frame: ",
                   first_fps)
+            closeSource(_capture, path)
             
             return None
     
@@ -150,7 +161,7 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
         bbox_delta = [bbox[0] - delta, bbox[1] - delta,
                       bbox[2] + delta, bbox[3] + delta]
         
-        _capture.release()
+        closeSource(_capture, path)
     
         if show == True:
             p1 = bbox_delta[0], bbox_delta[1]
@@ -160,7 +171,7 @@ def getBoundingBox(first_fps: int, path: str, area_points: np.ndarray,
     
         return bbox_delta, first_fps
 
-def selectBoundingBox(first_fps: int, path: str):
+def selectBoundingBox(first_fps: int, path: str | FrameSource):
     """Displays the initial frame to the user and allows them to manually select
     the bounding box by right-clicking and dragging the mouse.
 
@@ -168,17 +179,19 @@ def selectBoundingBox(first_fps: int, path: str):
     ----------
     first_fps : int
         Frame number of the initial frame.
-    path : str
-        Path to the video to be analyzed.
+    path : str or FrameSource
+        Path to the video to be analyzed or frame source to read it.
 
     Returns
     -------
     bbox : Rect
         The bounding box with the upper-left corner (x, y), width, and height.
     """    
-    capture = cv2.VideoCapture(path)
-    capture.set(cv2.CAP_PROP_POS_FRAMES, first_fps)
+    capture = openSource(path)
+    capture.seek(first_fps)
     success, frame = capture.read()
+    if frame.ndim == 2:
+        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
     
     window = "BBOX"
     font = cv2.FONT_HERSHEY_SIMPLEX
@@ -187,24 +200,24 @@ def selectBoundingBox(first_fps: int, path: str):
     cv2.putText(frame, 'Press ENTER to confirm.', (200, 70), font, 1, (0,255,0), 2)
     cv2.moveWindow(window, 179, 139)
     bbox = cv2.selectROI(window, frame, True)
-    capture.release()
+    closeSource(capture, path)
     cv2.destroyAllWindows()
     
     return bbox
 
-def trackingParticleCSRT(path: str, initial_fps: int, bbox: tuple, final_frame: int = 0,
+def trackingParticleCSRT(path: str | FrameSource, initial_fps: int, bbox: tuple, final_frame: int = 0,
                           orientation: int = 0, irl: bool = False):
     """Tracks the particle's position in each frame of the video until the video ends
     or the `final_frame` limit set by the user is reached.
 
     Parameters
     ----------
-    path : str
-        Path to the video to be analyzed.
+    path : str or FrameSource
+        Path to the video to be analyzed or frame source to read it.
     initial_fps : int
         Frame number where the tracker starts the analysis.
     bbox : tuple
-        Bounding box computed in the initial frame.
+        Bounding box computed in the initial frame, in pixels of the frames of `path`.
     final_frame : int
         Sets the last frame to be analyzed by the tracker, even if the video has more 
         frames afterward. By default 0 (analyzes all the frames in the video)
@@ -216,12 +229,12 @@ def trackingParticleCSRT(path: str, initial_fps: int, bbox: tuple, final_frame:
     Returns
     -------
     coords : list
-        List of points (x,y) computed by the tracker.
+        List of points (x,y) computed by the tracker, in pixels of the original video.
     """    
     
     # Sets the video in the initial frame
-    capture = cv2.VideoCapture(path)
-    capture.set(cv2.CAP_PROP_POS_FRAMES, initial_fps)
+    capture = openSource(path)
+    capture.seek(initial_fps)
     success, frame = capture.read()
     count = capture.get(cv2.CAP_PROP_FRAME_COUNT)
     fps = initial_fps
@@ -234,9 +247,9 @@ def trackingParticleCSRT(path: str, initial_fps: int, bbox: tuple, final_frame:
     success_track = tracker.init(frame, bbox)
 
     while fps < count:
-        # Compute the central point of the bbox
-        X = int((bbox[0]+bbox[0]+bbox[2])/2)
-        Y = int((bbox[1]+bbox[1]+bbox[3])/2)
+        # Compute the central point of the bbox in pixels of the original video
+        X = int((bbox[0]+bbox[0]+bbox[2])/(2*capture.scale))
+        Y = int((bbox[1]+bbox[1]+bbox[3])/(2*capture.scale))
         
         # Saves the coordinates depending on the orientation
         if orientation == 90:
@@ -259,7 +272,7 @@ def trackingParticleCSRT(path: str, initial_fps: int, bbox: tuple, final_frame:
           # Shows the tracking in real time
           if success_track is True:
             if irl == True:
-                liveTracking(fps, frame, coords, bbox)
+                liveTracking(fps, frame, scalePoints(coords, capture.scale), bbox)
             
             continue
         
@@ -271,7 +284,7 @@ def trackingParticleCSRT(path: str, initial_fps: int, bbox: tuple, final_frame:
             break
     
     print('There are no more frames in the video.')
-    capture.release()
+    closeSource(capture, path)
     cv2.destroyAllWindows()
     
     return coords